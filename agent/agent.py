@@ -6,16 +6,19 @@ from google.adk.events import Event, EventActions
 
 from src.prompt import (
     ANALYSIS_AGENT_PROMPT,
+    CATALOG_AGENT_PROMPT,
     COORDINATOR_AGENT_PROMPT,
     EXTRACTION_AGENT_PROMPT,
     FILTERING_AGENT_PROMPT,
     PLANNER_AGENT_PROMPT,
 )
+from src.tools.catalog import query_catalog_tool
 from src.tools.crawling import (
     perform_best_first_extraction_workflow,
     perform_bfs_extraction_workflow,
     perform_dfs_extraction_workflow,
 )
+from src.tools.distributed import perform_distributed_extraction_workflow
 from src.tools.filters import (
     content_type_filter_tool,
     domain_filter_tool,
@@ -60,9 +63,18 @@ extraction_agent = LlmAgent(
         perform_bfs_extraction_workflow,
         perform_dfs_extraction_workflow,
         perform_best_first_extraction_workflow,
+        perform_distributed_extraction_workflow,
     ],
 )
 
+catalog_agent = LlmAgent(
+    name="catalog_agent",
+    model="gemini-2.5-flash-preview-05-20",
+    description="Answers product queries from the local catalog of previously extracted items",
+    instruction=CATALOG_AGENT_PROMPT,
+    tools=[query_catalog_tool],
+)
+
 
 # implement coordinator / dispatcher pattern
 coordinator_agent = Agent(
@@ -76,6 +88,7 @@ coordinator_agent = Agent(
         planner_agent,
         filtering_agent,
         extraction_agent,
+        catalog_agent,
     ],
 )
 
@@ -0,0 +1,185 @@
+import threading
+from collections import deque
+from statistics import mean
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from crawl4ai.deep_crawling.filters import URLFilter
+from crawl4ai.deep_crawling.scorers import KeywordRelevanceScorer, URLScorer
+
+from .catalog import item_key, iter_items, normalize_url
+
+
+class _BranchStats:
+    __slots__ = ("pages", "new_items", "recent_yields", "pending", "last_yield_page")
+
+    def __init__(self, patience: int):
+        self.pages = 0
+        self.new_items = 0
+        self.recent_yields = deque(maxlen=patience)
+        self.pending = set()
+        self.last_yield_page = 0
+
+
+class CrawlBudget:
+    """
+    Adaptive crawl budget fed by the extraction yield of every page, i.e. the number of
+    unique items it adds to what was already extracted during the crawl.
+
+    A branch (the parent path of a url, so listing pages and their pagination share one) is
+    exhausted once the average yield of its last `patience` pages drops below `min_yield`.
+    The crawl should stop once the average yield of the last `window` pages drops below
+    `min_yield` and no branch is still productive. Detail pages usually add nothing new
+    after their listing, so low-yield pages alone must not stop the crawl before it reaches
+    the listing's pagination. A branch stays productive only while its recent yield is at
+    least `min_yield`, links into it are still waiting to be crawled (see `track_link`), and
+    it yielded new items within the last `horizon` pages. A `min_yield` of 0 never stops the
+    crawl nor prunes a branch.
+
+    The budget is thread-safe, since the crawl's filters and scorer use it from the crawl loop
+    thread while pages are recorded from the caller's loop.
+    """
+
+    def __init__(
+        self,
+        min_yield: float = 0.5,
+        window: int = 5,
+        patience: int = 3,
+        horizon: int = 20,
+    ):
+        self.min_yield = min_yield
+        self.window = window
+        self.patience = patience
+        self.horizon = horizon
+        self.pages_crawled = 0
+        self._lock = threading.Lock()
+        self._seen_items = set()
+        self._recent_yields = deque(maxlen=window)
+        self._branches: Dict[str, _BranchStats] = {}
+
+    @staticmethod
+    def branch_of(url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.netloc}{parsed.path.rstrip('/').rsplit('/', 1)[0]}"
+
+    def _branch(self, url: str) -> _BranchStats:
+        return self._branches.setdefault(
+            self.branch_of(url), _BranchStats(self.patience)
+        )
+
+    def track_link(self, url: str):
+        """
+        Records a link queued for crawling, so its branch is known to still have pages ahead.
+        """
+        with self._lock:
+            self._branch(url).pending.add(normalize_url(url))
+
+    def record_page(self, url: str, page_data) -> int:
+        """
+        Records the structured data extracted from a page and returns its yield.
+
+        Args:
+            url: The url of the scraped page.
+            page_data: The structured data extracted from the page, or None if extraction failed.
+
+        Returns:
+            The number of new unique items found on the page.
+        """
+        new_items = 0
+        with self._lock:
+            for _, _, item in iter_items([page_data] if page_data else []):
+                key = item_key(item["name"], item.get("url"))
+                if key not in self._seen_items:
+                    self._seen_items.add(key)
+                    new_items += 1
+
+            self.pages_crawled += 1
+            self._recent_yields.append(new_items)
+            branch = self._branch(url)
+            branch.pages += 1
+            branch.new_items += new_items
+            branch.recent_yields.append(new_items)
+            branch.pending.discard(normalize_url(url))
+            if new_items:
+                branch.last_yield_page = self.pages_crawled
+        return new_items
+
+    def branch_yield(self, url: str) -> Optional[float]:
+        """
+        Returns the average yield of the pages already crawled in the branch of `url`,
+        or None if none were.
+        """
+        with self._lock:
+            branch = self._branches.get(self.branch_of(url))
+            if not branch or not branch.pages:
+                return None
+            return branch.new_items / branch.pages
+
+    def is_branch_exhausted(self, url: str) -> bool:
+        with self._lock:
+            branch = self._branches.get(self.branch_of(url))
+            return (
+                branch is not None
+                and len(branch.recent_yields) == self.patience
+                and mean(branch.recent_yields) < self.min_yield
+            )
+
+    def _is_productive(self, branch: _BranchStats) -> bool:
+        return (
+            bool(branch.pending)
+            and bool(branch.recent_yields)
+            and mean(branch.recent_yields) >= self.min_yield
+            and self.pages_crawled - branch.last_yield_page < self.horizon
+        )
+
+    def should_stop(self) -> bool:
+        with self._lock:
+            return (
+                len(self._recent_yields) == self.window
+                and mean(self._recent_yields) < self.min_yield
+                and not any(self._is_productive(b) for b in self._branches.values())
+            )
+
+
+class YieldFeedbackScorer(URLScorer):
+    """
+    Best-First url scorer combining keyword relevance with the observed extraction yield of
+    the url's branch, so links into sections that keep producing new items are crawled first.
+    Branches without any crawled page yet get a neutral yield score.
+
+    crawl4ai 0.6 queues urls on a min-heap and crawls the lowest score first, so the score is
+    the inverse of the url's value. crawl4ai is pinned to 0.6 in pyproject.toml for this.
+    """
+
+    def __init__(self, budget: CrawlBudget, keywords=None, weight: float = 1.0):
+        super().__init__(weight=weight)
+        self._budget = budget
+        self._keyword_scorer = (
+            KeywordRelevanceScorer(keywords=keywords, weight=1.0) if keywords else None
+        )
+
+    def _calculate_score(self, url: str) -> float:
+        branch_yield = self._budget.branch_yield(url)
+        # Squash the average number of new items per page into [0, 1).
+        value = 0.5 if branch_yield is None else branch_yield / (branch_yield + 1)
+        if self._keyword_scorer:
+            value = (self._keyword_scorer.score(url) + value) / 2
+        return 1 - value
+
+
+class ExhaustedBranchFilter(URLFilter):
+    """
+    Rejects urls whose branch is exhausted according to the crawl budget, and tracks the
+    accepted ones as pending links of their branch. It must be the last filter of the chain.
+    """
+
+    def __init__(self, budget: CrawlBudget):
+        super().__init__()
+        self._budget = budget
+
+    def apply(self, url: str) -> bool:
+        passed = not self._budget.is_branch_exhausted(url)
+        if passed:
+            self._budget.track_link(url)
+        self._update_stats(passed)
+        return passed
@@ -0,0 +1,387 @@
+import os
+import re
+import sqlite3
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import List, Optional, Tuple
+from urllib.parse import urldefrag, urlparse
+
+CATALOG_DB_PATH = os.getenv("CATALOG_DB_PATH", "catalog.db")
+
+# Longest symbols first so "US$" is not read as "$".
+_CURRENCY_SYMBOLS = {
+    "US$": "USD",
+    "A$": "AUD",
+    "C$": "CAD",
+    "NZ$": "NZD",
+    "HK$": "HKD",
+    "S$": "SGD",
+    "R$": "BRL",
+    "$": "USD",
+    "€": "EUR",
+    "£": "GBP",
+    "¥": "JPY",
+    "₹": "INR",
+    "₩": "KRW",
+    "₽": "RUB",
+    "₺": "TRY",
+    "zł": "PLN",
+}
+_SYMBOL = "|".join(re.escape(symbol) for symbol in _CURRENCY_SYMBOLS)
+# ISO 4217 codes of the currencies commonly seen on shops. Any other three capital letters
+# ("QTY", "PCS", "NOW") are not a currency.
+_CURRENCY_CODES = (
+    "AED ARS AUD BGN BRL CAD CHF CLP CNY COP CZK DKK EGP EUR GBP HKD HUF IDR ILS INR ISK "
+    "JPY KES KRW KWD MXN MYR NGN NOK NZD PEN PHP PLN QAR RON RUB SAR SEK SGD THB TRY TWD "
+    "UAH USD VND ZAR"
+).split()
+_CODE = r"\b(?:{})\b".format("|".join(_CURRENCY_CODES))
+# Spaces only group thousands, so "2 for 10" is not read as 210.
+_AMOUNT = r"\d+(?:(?:[.,']|[ \u00a0\u202f](?=\d{3}\b))\d+)*"
+# An amount with a currency right before or after it, e.g. "$20" or "20 EUR". A currency
+# followed by a number belongs to that number, so "2 $10" is 10.
+_PRICE_RE = re.compile(
+    rf"(?P<pre>{_SYMBOL}|{_CODE})\s?(?P<pre_amount>{_AMOUNT})"
+    rf"|(?P<post_amount>{_AMOUNT})\s?(?P<post>{_SYMBOL}|{_CODE})(?!\s?\d)"
+)
+_AMOUNT_RE = re.compile(_AMOUNT)
+
+
+# Bump when the schema changes. The catalog is rebuilt by crawling, so older
+# catalogs are dropped rather than migrated.
+_SCHEMA_VERSION = 1
+
+_DROP_SCHEMA = """
+DROP TABLE IF EXISTS items_fts;
+DROP TABLE IF EXISTS items;
+"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    site TEXT NOT NULL DEFAULT '',
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    url TEXT NOT NULL DEFAULT '',
+    category TEXT NOT NULL DEFAULT '',
+    price TEXT,
+    price_cents INTEGER,
+    currency TEXT,
+    page_url TEXT,
+    UNIQUE (site, name_key, url)
+);
+CREATE INDEX IF NOT EXISTS idx_items_site_category_currency_price
+    ON items (site, category COLLATE NOCASE, currency, price_cents);
+CREATE INDEX IF NOT EXISTS idx_items_category_currency_price
+    ON items (category COLLATE NOCASE, currency, price_cents);
+CREATE INDEX IF NOT EXISTS idx_items_currency_price ON items (currency, price_cents);
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts
+    USING fts5(name, content='items', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS items_ai AFTER INSERT ON items BEGIN
+    INSERT INTO items_fts (rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS items_ad AFTER DELETE ON items BEGIN
+    INSERT INTO items_fts (items_fts, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+CREATE TRIGGER IF NOT EXISTS items_au AFTER UPDATE OF name ON items BEGIN
+    INSERT INTO items_fts (items_fts, rowid, name) VALUES ('delete', old.id, old.name);
+    INSERT INTO items_fts (rowid, name) VALUES (new.id, new.name);
+END;
+"""
+
+
+def _parse_amount(amount: str) -> Optional[Decimal]:
+    """
+    Parses a number written with any common thousands / decimal separator convention.
+    """
+    amount = re.sub(r"['\s]", "", amount)
+    if "." in amount and "," in amount:
+        decimal_sep = "." if amount.rfind(".") > amount.rfind(",") else ","
+    elif amount.count(".") == 1 or amount.count(",") == 1:
+        sep = "." if "." in amount else ","
+        # A single separator followed by exactly three digits groups thousands.
+        decimal_sep = None if len(amount) - amount.find(sep) - 1 == 3 else sep
+    else:
+        decimal_sep = None
+
+    thousands_sep = {".": ",", ",": "."}.get(decimal_sep)
+    if thousands_sep:
+        amount = amount.replace(thousands_sep, "").replace(decimal_sep, ".")
+    else:
+        amount = amount.replace(".", "").replace(",", "")
+
+    try:
+        return Decimal(amount)
+    except InvalidOperation:
+        return None
+
+
+def parse_price(price: Optional[str]) -> Tuple[Optional[Decimal], Optional[str]]:
+    """
+    Parses a free-form price string into a decimal amount and an ISO 4217 currency code.
+
+    Handles symbols and codes on either side of the amount as well as both `1,299.99` and
+    `1.299,99` separator conventions. Only amounts next to a currency count as prices, so
+    "2 for $10" is 10. When there are several (ranges, "was $20 now $15"), the lowest one in
+    the currency of the first price is used, since amounts in different currencies cannot be
+    compared. Without any currency, the first number in the string is used.
+
+    Args:
+        price: The price as extracted from the page, e.g. "$1,299.99" or "12,50 €".
+
+    Returns:
+        A tuple of the amount and the currency code. Either may be None if it cannot be found.
+    """
+    if not price:
+        return None, None
+
+    prices = []
+    for match in _PRICE_RE.finditer(price):
+        amount = _parse_amount(match.group("pre_amount") or match.group("post_amount"))
+        marker = match.group("pre") or match.group("post")
+        if amount is not None:
+            prices.append((amount, _CURRENCY_SYMBOLS.get(marker, marker)))
+    if prices:
+        currency = prices[0][1]
+        return min(amount for amount, c in prices if c == currency), currency
+
+    amount_match = _AMOUNT_RE.search(price)
+    return (_parse_amount(amount_match.group()) if amount_match else None), None
+
+
+def normalize_name(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+def normalize_url(url: Optional[str]) -> str:
+    if not url:
+        return ""
+    return urldefrag(url.strip())[0].rstrip("/")
+
+
+def normalize_site(url: Optional[str]) -> str:
+    """
+    Returns the site of a url or bare domain, e.g. "shop.com" for "https://www.shop.com/a".
+    """
+    if not url:
+        return ""
+    url = url.strip()
+    if "//" not in url:
+        url = "//" + url
+    site = (urlparse(url).hostname or "").lower()
+    return site[4:] if site.startswith("www.") else site
+
+
+def item_key(name: str, url: Optional[str]) -> Tuple[str, str]:
+    """
+    Returns the key used to deduplicate items across pages.
+    """
+    return normalize_name(name), normalize_url(url)
+
+
+def iter_items(extracted_data: List[dict]):
+    """
+    Yields `(page_url, category, item)` for every item in the output of the extraction workflows,
+    where each entry holds the data of one page, either a ProductModel dictionary or a list of them.
+    """
+    for page_data in extracted_data:
+        pages = page_data if isinstance(page_data, list) else [page_data]
+        for page in pages:
+            if not isinstance(page, dict):
+                continue
+            for product in page.get("products") or []:
+                for item in product.get("items") or []:
+                    if item.get("name"):
+                        yield page.get("page_url"), product.get("category") or "", item
+
+
+def _is_catalog(conn: sqlite3.Connection) -> bool:
+    tables = {
+        row["name"]
+        for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    }
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(items)")}
+    return not tables or "items_fts" in tables or "name_key" in columns
+
+
+def _connect(db_path: Optional[str] = None) -> sqlite3.Connection:
+    db_path = db_path or CATALOG_DB_PATH
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    if conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+        # Only ever drop tables of an older catalog, never of an unrelated database.
+        if not _is_catalog(conn):
+            conn.close()
+            raise sqlite3.DatabaseError(
+                f"{db_path} is not a catalog database. Set CATALOG_DB_PATH to a new file."
+            )
+        conn.executescript(_DROP_SCHEMA)
+        conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def index_extracted_data(
+    extracted_data: List[dict], db_path: Optional[str] = None
+) -> int:
+    """
+    Normalizes the prices of extracted items and stores them in the local catalog index.
+
+    Every item dictionary is annotated in place with `amount` (decimal string) and `currency`.
+    Items are tagged with the site of their page and deduplicated across pages of a site by
+    normalized name and url, later pages overwriting earlier ones.
+
+    Args:
+        extracted_data: The list returned by one of the extraction workflows.
+        db_path: Path of the SQLite database. Defaults to `CATALOG_DB_PATH`.
+
+    Returns:
+        The number of items written to the index.
+    """
+    rows = []
+    for page_url, category, item in iter_items(extracted_data):
+        amount, currency = parse_price(item.get("price"))
+        item["amount"] = str(amount) if amount is not None else None
+        item["currency"] = currency
+
+        price_cents = None
+        if amount is not None:
+            price_cents = int(
+                (amount * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
+            )
+
+        name_key, url = item_key(item["name"], item.get("url"))
+        rows.append(
+            (
+                normalize_site(page_url or url),
+                item["name"].strip(),
+                name_key,
+                url,
+                category.strip(),
+                item.get("price"),
+                price_cents,
+                currency,
+                page_url,
+            )
+        )
+
+    if not rows:
+        return 0
+
+    conn = _connect(db_path)
+    try:
+        with conn:
+            conn.executemany(
+                """
+                INSERT INTO items (
+                    site, name, name_key, url, category, price, price_cents, currency,
+                    page_url
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (site, name_key, url) DO UPDATE SET
+                    name = excluded.name,
+                    category = excluded.category,
+                    price = excluded.price,
+                    price_cents = excluded.price_cents,
+                    currency = excluded.currency,
+                    page_url = excluded.page_url
+                """,
+                rows,
+            )
+    finally:
+        conn.close()
+
+    print(
+        f"Indexed {len(rows)} item(s) into the catalog at {db_path or CATALOG_DB_PATH}."
+    )
+    return len(rows)
+
+
+def _fts_query(text: str) -> str:
+    # Quote every term so user input is never read as FTS syntax, and match on prefixes.
+    return " ".join('"{}"*'.format(term.replace('"', '""')) for term in text.split())
+
+
+def query_catalog(
+    query: str = "",
+    site: str = "",
+    category: str = "",
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    currency: str = "",
+    sort_by: str = "price",
+    limit: int = 20,
+    db_path: Optional[str] = None,
+) -> List[dict]:
+    """
+    Queries the local catalog index. See `query_catalog_tool` for the meaning of the arguments.
+
+    Amounts in different currencies are not comparable, so price orders group items by
+    currency first and only order by price within a currency.
+    """
+    clauses = []
+    params = []
+    join = ""
+    if query.strip():
+        join = "JOIN items_fts ON items_fts.rowid = items.id"
+        clauses.append("items_fts MATCH ?")
+        params.append(_fts_query(query))
+    if site.strip():
+        clauses.append("items.site = ?")
+        params.append(normalize_site(site))
+    if category.strip():
+        clauses.append("items.category = ? COLLATE NOCASE")
+        params.append(category.strip())
+    if min_price is not None:
+        clauses.append("items.price_cents >= ?")
+        params.append(round(min_price * 100))
+    if max_price is not None:
+        clauses.append("items.price_cents <= ?")
+        params.append(round(max_price * 100))
+    if currency.strip():
+        clauses.append("items.currency = ?")
+        params.append(currency.strip().upper())
+
+    by_currency = "items.currency IS NULL, items.currency, items.price_cents IS NULL"
+    if sort_by == "price":
+        order = f"{by_currency}, items.price_cents ASC"
+    elif sort_by == "price_desc":
+        order = f"{by_currency}, items.price_cents DESC"
+    elif sort_by == "relevance":
+        order = "bm25(items_fts)" if join else "items.id"
+    else:
+        raise ValueError(f"Unsupported sort order: {sort_by}")
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    sql = f"""
+        SELECT items.site, items.name, items.url, items.category, items.price,
+               items.price_cents, items.currency, items.page_url
+        FROM items {join}
+        {where}
+        ORDER BY {order}
+        LIMIT ?
+    """
+    params.append(limit)
+
+    conn = _connect(db_path)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+    return [
+        {
+            "site": row["site"],
+            "name": row["name"],
+            "url": row["url"] or None,
+            "category": row["category"],
+            "price": row["price"],
+            "amount": (
+                str(Decimal(row["price_cents"]).scaleb(-2))
+                if row["price_cents"] is not None
+                else None
+            ),
+            "currency": row["currency"],
+            "page_url": row["page_url"],
+        }
+        for row in rows
+    ]
@@ -0,0 +1,46 @@
+from typing import List, Optional
+
+from ..catalog import query_catalog
+
+
+async def query_catalog_tool(
+    query: str = "",
+    site: str = "",
+    category: str = "",
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    currency: str = "",
+    sort_by: str = "price",
+    limit: int = 20,
+) -> List[dict]:
+    """Searches the local catalog of products extracted by previous crawls, without crawling the website again.
+
+    Every extraction workflow adds its items to this catalog with normalized prices, tagged with the site they come from
+    and deduplicated by name and url. The catalog holds items of every site crawled so far, so always set `site` when the
+    question is about a specific website. Use it to answer questions such as "cheapest shirts" or "laptops under 1000" in milliseconds.
+
+    Args:
+        query: Words to full-text search in item names, e.g. "blue shirt". Each word also matches as a prefix. Leave empty to match all items.
+        site: Only return items of this website, as a domain or url, e.g. "shop.com". Leave empty to search every crawled site.
+        category: Only return items of this category (case insensitive exact match), e.g. "Accessories".
+        min_price: Only return items with a price greater than or equal to this amount. Without `currency` it applies to the amounts of every currency.
+        max_price: Only return items with a price lower than or equal to this amount. Without `currency` it applies to the amounts of every currency.
+        currency: Only return items priced in this ISO 4217 currency code, e.g. "USD". Set it whenever prices are compared, since amounts in different currencies are not converted.
+        sort_by: One of "price" (cheapest first), "price_desc" (most expensive first) or "relevance" (best match for `query` first). Price orders group items by currency first and only order by price within each currency.
+        limit: The maximum number of items to return.
+
+    Returns:
+        A list of dictionaries with the item `site`, `name`, `url`, `category`, original `price` string, normalized decimal `amount`,
+        `currency` and the `page_url` it was extracted from. Returns an empty list if no item matches.
+    """
+    print(f"Querying catalog for '{query}' on site '{site}' in category '{category}'...")
+    return query_catalog(
+        query=query,
+        site=site,
+        category=category,
+        min_price=min_price,
+        max_price=max_price,
+        currency=currency,
+        sort_by=sort_by,
+        limit=limit,
+    )
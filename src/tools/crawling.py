@@ -1,6 +1,8 @@
+import asyncio
 import json
 import os
-from typing import List, Optional, Type
+import threading
+from typing import AsyncGenerator, List, Optional, Type
 
 from crawl4ai import AsyncWebCrawler, BrowserConfig, CacheMode, CrawlerRunConfig
 from crawl4ai.deep_crawling import (
@@ -12,30 +14,25 @@ from crawl4ai.deep_crawling.filters import (
     ContentTypeFilter,
     DomainFilter,
     FilterChain,
+    URLFilter,
     URLPatternFilter,
 )
-from crawl4ai.deep_crawling.scorers import KeywordRelevanceScorer
 from google import genai
 from google.genai import types
 from pydantic import BaseModel
 
+from ..budget import CrawlBudget, ExhaustedBranchFilter, YieldFeedbackScorer
+from ..catalog import index_extracted_data, normalize_url
 from ..models import ProductModel
 from ..prompt import FORMATTING_PROMPT
 
 
-async def _crawl_pages(
-    start_url: str,
-    strategy_type: str,
-    filters: List[dict] = None,
-    max_pages: int = None,
-    max_depth: int = None,
-    keywords: List[str] = None,
-):
+def _build_filters(filters: Optional[List[dict]]) -> List[URLFilter]:
     """
-    Internal helper to perform web crawling with a specified strategy and filters.
+    Internal helper to construct the url filter objects from their configuration.
     """
+    filter_objs = []
     if filters:
-        filter_objs = []
         for f in filters:
             if f["type"] == "url_pattern":
                 filter_objs.append(URLPatternFilter(patterns=f["patterns"]))
@@ -50,10 +47,36 @@ async def _crawl_pages(
                 filter_objs.append(ContentTypeFilter(allowed_types=f["allowed_types"]))
             else:
                 continue
+    return filter_objs
 
-        filter_chain = FilterChain(filter_objs)
-    else:
-        filter_chain = None
+
+async def _crawl_pages(
+    start_url: str,
+    strategy_type: str,
+    filters: List[dict] = None,
+    max_pages: int = None,
+    max_depth: int = None,
+    keywords: List[str] = None,
+    budget: Optional[CrawlBudget] = None,
+    extra_filters: Optional[List[URLFilter]] = None,
+) -> AsyncGenerator:
+    """
+    Internal helper to perform web crawling with a specified strategy and filters.
+
+    Pages are yielded as soon as they are crawled. `extra_filters` are applied after the
+    configured filters. When a budget is given, links into exhausted branches are skipped,
+    Best-First urls are scored on the yield of their branch and the crawl stops as soon as
+    the budget says so.
+    """
+    filter_objs = _build_filters(filters)
+
+    if extra_filters:
+        filter_objs.extend(extra_filters)
+
+    if budget:
+        filter_objs.append(ExhaustedBranchFilter(budget))
+
+    filter_chain = FilterChain(filter_objs) if filter_objs else None
 
     if strategy_type == "BFS":
         crawl_strategy = BFSDeepCrawlStrategy(
@@ -72,11 +95,9 @@ async def _crawl_pages(
     elif strategy_type == "BestFirst":
         if not keywords:
             print(
-                "Warning: BestFirstCrawlingStrategy called without keywords. Scorer will be basic."
+                "Warning: BestFirstCrawlingStrategy called without keywords. Scorer will only use extraction yield."
             )
-            url_scorer = None
-        else:
-            url_scorer = KeywordRelevanceScorer(keywords=keywords, weight=0.7)
+        url_scorer = YieldFeedbackScorer(budget or CrawlBudget(), keywords=keywords)
 
         crawl_strategy = BestFirstCrawlingStrategy(
             max_depth=max_depth,
@@ -91,21 +112,71 @@ async def _crawl_pages(
     crawl_config = CrawlerRunConfig(
         cache_mode=CacheMode.BYPASS,
         deep_crawl_strategy=crawl_strategy,
+        stream=True,
         verbose=True,
     )
 
     browser_config = BrowserConfig(headless=True)
 
-    async with AsyncWebCrawler(config=browser_config) as crawler:
+    # The crawl runs on its own event loop, so stopping it early can cancel every task
+    # crawl4ai started for it without touching tasks of other crawls on the caller's loop.
+    crawl_loop = asyncio.new_event_loop()
+    crawl_thread = threading.Thread(target=crawl_loop.run_forever, daemon=True)
+    crawl_thread.start()
+
+    def on_crawl_loop(coro):
+        return asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, crawl_loop))
+
+    crawler = AsyncWebCrawler(config=browser_config)
+    results = None
+    try:
+        await on_crawl_loop(crawler.start())
+        browser_tasks = await on_crawl_loop(_running_tasks())
         print(f"Starting {strategy_type} deep scrape from {start_url}")
-        results = await crawler.arun(start_url, config=crawl_config)
+        results = await on_crawl_loop(crawler.arun(start_url, config=crawl_config))
+        while True:
+            result = await on_crawl_loop(_next_result(results))
+            if result is None:
+                break
+            yield result
+            if budget and budget.should_stop():
+                print(
+                    f"Extraction yield dropped below {budget.min_yield} new item(s) per page. Stopping crawl."
+                )
+                # Closing the stream alone leaves the strategy's dispatcher crawling, so
+                # stop the strategy and cancel the pages in flight.
+                await on_crawl_loop(crawl_strategy.shutdown())
+                await on_crawl_loop(_cancel_tasks(exclude=browser_tasks))
+                break
+    finally:
+        try:
+            if results is not None:
+                await on_crawl_loop(results.aclose())
+            await on_crawl_loop(crawler.close())
+        finally:
+            crawl_loop.call_soon_threadsafe(crawl_loop.stop)
+            await asyncio.to_thread(crawl_thread.join)
+            crawl_loop.close()
+
+
+async def _running_tasks():
+    return asyncio.all_tasks()
 
-        if not results:
-            print(f"Crawler returned no results for {start_url}. No data to process.")
-            return []
 
-        print(f"Crawler finished. Found {len(results)} scraped page(s).")
-        return results
+async def _next_result(results):
+    async for result in results:
+        return result
+    return None
+
+
+async def _cancel_tasks(exclude):
+    """
+    Cancels the tasks running on the current loop, except `exclude` and the caller itself.
+    """
+    tasks = asyncio.all_tasks() - exclude - {asyncio.current_task()}
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
 
 
 async def _format_data_md(
@@ -146,11 +217,72 @@ async def _format_data_md(
         return None
 
 
+async def _extract_structured_data(
+    scraped_pages,
+    budget: Optional[CrawlBudget] = None,
+    seen_urls=None,
+    shard_id: Optional[str] = None,
+) -> List[dict]:
+    """
+    Internal helper to format the markdown of scraped pages into structured data.
+
+    Args:
+        scraped_pages: Async iterator of crawl results, as returned by `_crawl_pages`.
+        budget: Optional crawl budget fed with the yield of every formatted page.
+        seen_urls: Optional dict-like object shared between worker processes, mapping normalized
+            page urls to the shard that claimed them. Pages already claimed by another shard are skipped so
+            overlapping shards are only formatted once.
+        shard_id: Identifier of the shard being extracted, required with `seen_urls`. Worker
+            processes are reused across shards, so this must not be the process id.
+
+    Returns:
+        A list with the structured data extracted from every page that produced any.
+    """
+    all_extracted_data: List[dict] = []
+    page_count = 0
+    async for res in scraped_pages:
+        page_count += 1
+        if not res.markdown:
+            if budget:
+                budget.record_page(res.url, None)
+            continue
+        if (
+            seen_urls is not None
+            and seen_urls.setdefault(normalize_url(res.url), shard_id) != shard_id
+        ):
+            print(f"Skipping {res.url}, already extracted by another shard.")
+            continue
+        json_data = await _format_data_md(res.markdown, FORMATTING_PROMPT)
+        # The model only sees the markdown, so it cannot know the url of the page.
+        for page in json_data if isinstance(json_data, list) else [json_data]:
+            if isinstance(page, dict):
+                page["page_url"] = res.url
+        if budget:
+            new_items = budget.record_page(res.url, json_data)
+            print(f"Extracted {new_items} new item(s) from {res.url}")
+        if json_data:
+            all_extracted_data.append(json_data)
+
+    print(f"Crawler finished. Processed {page_count} scraped page(s).")
+    return all_extracted_data
+
+
+def _index_catalog(all_extracted_data: List[dict]):
+    """
+    Post-extraction stage: normalizes item prices and adds the items to the local catalog index.
+    """
+    try:
+        index_extracted_data(all_extracted_data)
+    except Exception as e:
+        print(f"Error indexing extracted data into the catalog: {e}")
+
+
 async def perform_bfs_extraction_workflow(
     start_url: str,
     filters: Optional[List[dict]] = None,
     max_pages: int = 15,
     max_depth: int = 3,
+    min_yield: float = 0.5,
 ) -> List[dict]:
     """Performs a Breadth-First Search (BFS) web crawl starting from a given URL and extracts structured data from pages matching specified patterns.
 
@@ -161,28 +293,22 @@ async def perform_bfs_extraction_workflow(
         filters: A list of filter configuration used to construct filter objects for crawling.
         max_pages: The maximum number of pages to crawl.
         max_depth: The maximum depth to crawl from the start_url.
+        min_yield: The minimum average number of new unique items per page. The crawl stops, and sections stop being followed, once the recent pages yield fewer new items than this. Set to 0 to always spend the full page budget.
 
     Returns:
         A list of dictionaries, where each dictionary represents structured data extracted from a scraped page, conforming to the ProductModel. Returns an empty list if no data is extracted or no pages are found.
     """
-    all_extracted_data: List[dict] = []
-    scraped_pages = await _crawl_pages(
+    budget = CrawlBudget(min_yield=min_yield)
+    scraped_pages = _crawl_pages(
         start_url=start_url,
         filters=filters,
         strategy_type="BFS",
         max_pages=max_pages,
         max_depth=max_depth,
+        budget=budget,
     )
-
-    if not scraped_pages:
-        return []
-
-    print(f"Processing {len(scraped_pages)} scraped page(s) for extraction...")
-    for res in scraped_pages:
-        if res.markdown:
-            json_data = await _format_data_md(res.markdown, FORMATTING_PROMPT)
-            if json_data:
-                all_extracted_data.append(json_data)
+    all_extracted_data = await _extract_structured_data(scraped_pages, budget=budget)
+    _index_catalog(all_extracted_data)
     return all_extracted_data
 
 
@@ -191,6 +317,7 @@ async def perform_dfs_extraction_workflow(
     filters: Optional[List[dict]] = None,
     max_pages: int = 15,
     max_depth: int = 3,
+    min_yield: float = 0.5,
 ) -> List[dict]:
     """Performs a Depth-First Search (DFS) web crawl starting from a given URL and extracts structured data from pages matching specified patterns.
 
@@ -201,28 +328,22 @@ async def perform_dfs_extraction_workflow(
         filters: A list of filter configuration used to construct filter objects for crawling.
         max_pages: The maximum number of pages to crawl.
         max_depth: The maximum depth to crawl from the start_url.
+        min_yield: The minimum average number of new unique items per page. The crawl stops, and sections stop being followed, once the recent pages yield fewer new items than this. Set to 0 to always spend the full page budget.
 
     Returns:
         A list of dictionaries, where each dictionary represents structured data extracted from a scraped page, conforming to the ProductModel. Returns an empty list if no data is extracted or no pages are found.
     """
-    all_extracted_data: List[dict] = []
-    scraped_pages = await _crawl_pages(
+    budget = CrawlBudget(min_yield=min_yield)
+    scraped_pages = _crawl_pages(
         start_url=start_url,
         filters=filters,
         strategy_type="DFS",
         max_pages=max_pages,
         max_depth=max_depth,
+        budget=budget,
     )
-
-    if not scraped_pages:
-        return []
-
-    print(f"Processing {len(scraped_pages)} scraped page(s) for extraction...")
-    for res in scraped_pages:
-        if res.markdown:
-            json_data = await _format_data_md(res.markdown, FORMATTING_PROMPT)
-            if json_data:
-                all_extracted_data.append(json_data)
+    all_extracted_data = await _extract_structured_data(scraped_pages, budget=budget)
+    _index_catalog(all_extracted_data)
     return all_extracted_data
 
 
@@ -232,10 +353,11 @@ async def perform_best_first_extraction_workflow(
     filters: Optional[List[dict]] = None,
     max_pages: int = 15,
     max_depth: int = 3,
+    min_yield: float = 0.5,
 ) -> List[dict]:
     """Performs a Best-First Search web crawl using keywords to score and prioritize URLs, then extracts structured data from pages matching specified patterns.
 
-    This tool crawls web pages by prioritizing URLs that are most relevant to the provided keywords. It filters pages based on URL patterns and extracts information according to the ProductModel schema.
+    This tool crawls web pages by prioritizing URLs that are most relevant to the provided keywords and that belong to sections which keep yielding new items. It filters pages based on URL patterns and extracts information according to the ProductModel schema.
 
     Args:
         start_url: The initial URL to begin crawling from.
@@ -243,27 +365,21 @@ async def perform_best_first_extraction_workflow(
         filters: A list of filter configuration used to construct filter objects for crawling.
         max_pages: The maximum number of pages to crawl.
         max_depth: The maximum depth to crawl from the start_url.
+        min_yield: The minimum average number of new unique items per page. The crawl stops, and sections stop being followed, once the recent pages yield fewer new items than this. Set to 0 to always spend the full page budget.
 
     Returns:
         A list of dictionaries, where each dictionary represents structured data extracted from a scraped page, conforming to the ProductModel. Returns an empty list if no data is extracted or no pages are found.
     """
-    all_extracted_data: List[dict] = []
-    scraped_pages = await _crawl_pages(
+    budget = CrawlBudget(min_yield=min_yield)
+    scraped_pages = _crawl_pages(
         start_url=start_url,
         filters=filters,
         strategy_type="BestFirst",
         max_pages=max_pages,
         max_depth=max_depth,
         keywords=keywords,
+        budget=budget,
     )
-
-    if not scraped_pages:
-        return []
-
-    print(f"Processing {len(scraped_pages)} scraped page(s) for extraction...")
-    for res in scraped_pages:
-        if res.markdown:
-            json_data = await _format_data_md(res.markdown, FORMATTING_PROMPT)
-            if json_data:
-                all_extracted_data.append(json_data)
+    all_extracted_data = await _extract_structured_data(scraped_pages, budget=budget)
+    _index_catalog(all_extracted_data)
     return all_extracted_data
@@ -0,0 +1,240 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from crawl4ai import AsyncWebCrawler, BrowserConfig, CacheMode, CrawlerRunConfig
+from crawl4ai.deep_crawling.filters import FilterChain, URLFilter
+
+from ..budget import CrawlBudget
+from ..catalog import normalize_url
+from .crawling import (
+    _build_filters,
+    _crawl_pages,
+    _extract_structured_data,
+    _index_catalog,
+)
+
+_FRONTIER_SHARD = "frontier"
+
+
+class ClaimedURLFilter(URLFilter):
+    """
+    Claims the urls discovered by a shard in the dict shared between worker processes, and
+    rejects the urls another shard claimed first, so pages reachable from several shards are
+    only fetched once. Urls are claimed when discovered, before their branch is checked by the
+    crawl budget, so a url pruned by its discovering shard is not crawled by any other shard.
+    """
+
+    def __init__(self, seen_urls, shard_id: str):
+        super().__init__()
+        self._seen_urls = seen_urls
+        self._shard_id = shard_id
+
+    def apply(self, url: str) -> bool:
+        passed = (
+            self._seen_urls.setdefault(normalize_url(url), self._shard_id)
+            == self._shard_id
+        )
+        self._update_stats(passed)
+        return passed
+
+
+def _plan_shards(
+    roots: List[str], num_workers: int, max_pages: int
+) -> List[Tuple[List[str], int]]:
+    """
+    Deals the roots round-robin into at most `num_workers` shards and splits `max_pages`
+    between them, so the whole job crawls at most `max_pages` pages.
+
+    Returns:
+        A list of (roots, max_pages) tuples, one per shard.
+    """
+    num_shards = min(num_workers, len(roots), max_pages)
+    if num_shards <= 0:
+        return []
+    base, extra = divmod(max_pages, num_shards)
+    return [
+        (roots[i::num_shards], base + (i < extra)) for i in range(num_shards)
+    ]
+
+
+async def _iter_pages(pages):
+    for page in pages:
+        yield page
+
+
+async def _expand_frontier(
+    start_urls: List[str], filters: Optional[List[dict]], seen_urls
+) -> Tuple[List[dict], List[str]]:
+    """
+    Crawls the start pages in the coordinator, so a job with fewer entry points than workers
+    can still be split. Returns the structured data of the start pages and their internal
+    links that pass the filters, which become the roots of the worker shards.
+    """
+    for url in start_urls:
+        seen_urls[normalize_url(url)] = _FRONTIER_SHARD
+
+    async with AsyncWebCrawler(config=BrowserConfig(headless=True)) as crawler:
+        results = await crawler.arun_many(
+            start_urls, config=CrawlerRunConfig(cache_mode=CacheMode.BYPASS)
+        )
+    results = [res for res in results if res.success]
+    extracted_data = await _extract_structured_data(
+        _iter_pages(results), seen_urls=seen_urls, shard_id=_FRONTIER_SHARD
+    )
+
+    filter_chain = FilterChain(_build_filters(filters))
+    roots = []
+    for res in results:
+        for link in (res.links or {}).get("internal", []):
+            url = normalize_url(link.get("href") or "")
+            if url and url not in seen_urls and await filter_chain.apply(url):
+                roots.append(url)
+    return extracted_data, list(dict.fromkeys(roots))
+
+
+def _run_shard(
+    roots: List[str],
+    shard_id: str,
+    strategy_type: str,
+    filters: Optional[List[dict]],
+    max_pages: int,
+    max_depth: int,
+    keywords: Optional[List[str]],
+    min_yield: float,
+    seen_urls,
+) -> List[dict]:
+    """
+    Entry point of a worker process. Crawls and formats a single shard of the frontier
+    on its own event loop, with its own browser and formatting client. The roots of the
+    shard are crawled in turn, sharing its page budget evenly.
+    """
+
+    async def _crawl_and_extract() -> List[dict]:
+        budget = CrawlBudget(min_yield=min_yield)
+        all_extracted_data: List[dict] = []
+        for i, root in enumerate(roots):
+            pages_left = max_pages - budget.pages_crawled
+            if pages_left <= 0 or budget.should_stop():
+                break
+            scraped_pages = _crawl_pages(
+                start_url=root,
+                filters=filters,
+                strategy_type=strategy_type,
+                max_pages=max(1, pages_left // (len(roots) - i)),
+                max_depth=max_depth,
+                keywords=keywords,
+                budget=budget,
+                extra_filters=[ClaimedURLFilter(seen_urls, shard_id)],
+            )
+            all_extracted_data.extend(
+                await _extract_structured_data(
+                    scraped_pages, budget=budget, seen_urls=seen_urls, shard_id=shard_id
+                )
+            )
+        return all_extracted_data
+
+    print(f"[worker {os.getpid()}] Processing {shard_id} ({len(roots)} root(s))")
+    return asyncio.run(_crawl_and_extract())
+
+
+async def perform_distributed_extraction_workflow(
+    start_urls: List[str],
+    strategy_type: str = "BFS",
+    filters: Optional[List[dict]] = None,
+    keywords: Optional[List[str]] = None,
+    max_pages: int = 15,
+    max_depth: int = 3,
+    num_workers: Optional[int] = None,
+    min_yield: float = 0.5,
+) -> List[dict]:
+    """Crawls one or several entry points in parallel worker processes and extracts structured data from the scraped pages.
+
+    The crawl frontier is split into shards handed to a pool of worker processes, and every worker runs its own browser and
+    formatting client, so large jobs use several cores instead of one. When there are fewer start urls than workers, the
+    start pages are crawled first and their links are split between the workers instead. Pages reachable from more than
+    one shard are only fetched and extracted once. Use this tool instead of the single strategy tools for large crawls.
+
+    Args:
+        start_urls: The entry point urls to crawl.
+        strategy_type: The crawl strategy used by every worker, one of "BFS", "DFS" or "BestFirst".
+        filters: A list of filter configuration used to construct filter objects for crawling.
+        keywords: A list of keywords used to score urls, required for the "BestFirst" strategy.
+        max_pages: The maximum number of pages to crawl in total, across all workers.
+        max_depth: The maximum depth to crawl from each start url.
+        num_workers: The number of worker processes. Defaults to the number of cpu cores.
+        min_yield: The minimum average number of new unique items per page. Each worker stops its crawl, and stops following sections, once its recent pages yield fewer new items than this. Set to 0 to always spend the full page budget.
+
+    Returns:
+        A list of dictionaries, where each dictionary represents structured data extracted from a scraped page, conforming to the ProductModel. Returns an empty list if no data is extracted or no pages are found.
+    """
+    if strategy_type not in ("BFS", "DFS", "BestFirst"):
+        raise ValueError(f"Unsupported crawl strategy type: {strategy_type}")
+
+    start_urls = list(dict.fromkeys(url.strip() for url in start_urls if url.strip()))
+    if not start_urls:
+        return []
+
+    num_workers = num_workers or os.cpu_count() or 1
+    # Browsers do not survive a fork, so workers are always spawned fresh.
+    mp_context = multiprocessing.get_context("spawn")
+    all_extracted_data: List[dict] = []
+    loop = asyncio.get_running_loop()
+    with mp_context.Manager() as manager:
+        seen_urls = manager.dict()
+        roots, pages_left, depth_left = start_urls, max_pages, max_depth
+        if len(start_urls) < num_workers and max_depth > 0:
+            try:
+                frontier_data, roots = await _expand_frontier(
+                    start_urls, filters, seen_urls
+                )
+                all_extracted_data.extend(frontier_data)
+                pages_left -= len(start_urls)
+                depth_left -= 1
+            except Exception as e:
+                print(f"Error expanding the crawl frontier, sharding the start urls: {e}")
+                seen_urls.clear()
+
+        shards = _plan_shards(roots, num_workers, pages_left)
+        shard_ids = [f"shard-{i}" for i in range(len(shards))]
+        # Roots are claimed up front so no other shard crawls them from a link.
+        for shard_id, (shard_roots, _) in zip(shard_ids, shards):
+            for root in shard_roots:
+                seen_urls[normalize_url(root)] = shard_id
+        print(
+            f"Starting distributed {strategy_type} scrape of {len(roots)} root(s) in {len(shards)} shard(s)"
+        )
+
+        if shards:
+            with ProcessPoolExecutor(
+                max_workers=len(shards), mp_context=mp_context
+            ) as executor:
+                futures = [
+                    loop.run_in_executor(
+                        executor,
+                        _run_shard,
+                        shard_roots,
+                        shard_id,
+                        strategy_type,
+                        filters,
+                        shard_max_pages,
+                        depth_left,
+                        keywords,
+                        min_yield,
+                        seen_urls,
+                    )
+                    for shard_id, (shard_roots, shard_max_pages) in zip(shard_ids, shards)
+                ]
+                for shard_id, result in zip(
+                    shard_ids, await asyncio.gather(*futures, return_exceptions=True)
+                ):
+                    if isinstance(result, BaseException):
+                        print(f"Worker failed on {shard_id}: {result}")
+                        continue
+                    all_extracted_data.extend(result)
+
+    print(f"Distributed scrape finished. Extracted {len(all_extracted_data)} page(s).")
+    _index_catalog(all_extracted_data)
+    return all_extracted_data
@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("crawl4ai")
+
+from src.budget import CrawlBudget, YieldFeedbackScorer
+
+
+class StubBudget:
+    def __init__(self, yields):
+        self._yields = yields
+
+    def branch_yield(self, url):
+        return self._yields.get(url)
+
+
+def test_best_first_queue_pops_high_yield_branches_first():
+    budget = StubBudget(
+        {
+            "https://shop.com/shirts": 8.0,
+            "https://shop.com/blog": 0.0,
+        }
+    )
+    scorer = YieldFeedbackScorer(budget, keywords=["shirts"])
+
+    async def pop_order():
+        # Same queue entries as BestFirstCrawlingStrategy: (score, depth, url, parent).
+        queue = asyncio.PriorityQueue()
+        for url in [
+            "https://shop.com/blog",
+            "https://shop.com/new",
+            "https://shop.com/shirts",
+        ]:
+            await queue.put((scorer.score(url), 1, url, None))
+        return [(await queue.get())[2] for _ in range(queue.qsize())]
+
+    assert asyncio.run(pop_order()) == [
+        "https://shop.com/shirts",
+        "https://shop.com/new",
+        "https://shop.com/blog",
+    ]
+
+
+def _page(*names):
+    items = [{"name": name, "price": "$1"} for name in names]
+    return [{"page_url": "", "products": [{"category": "Shirts", "items": items}]}]
+
+
+def _crawl_listing(budget, listing_url, names, next_page_url=None):
+    """Records a listing page and queues its detail pages and next page, like BFS."""
+    new_items = budget.record_page(listing_url, _page(*names))
+    detail_urls = [
+        f"https://shop.com/products/{name.lower().replace(' ', '-')}" for name in names
+    ]
+    for url in detail_urls + ([next_page_url] if next_page_url else []):
+        budget.track_link(url)
+    return new_items, detail_urls
+
+
+def test_budget_keeps_crawling_to_pagination_after_detail_pages():
+    budget = CrawlBudget(min_yield=0.5, window=5, patience=3)
+    listing = [f"Tee {i}" for i in range(10)]
+
+    new_items, detail_urls = _crawl_listing(
+        budget, "https://shop.com/shirts", listing, "https://shop.com/shirts?page=2"
+    )
+    assert new_items == 10
+    # Product detail pages only repeat what the listing already yielded.
+    for url, name in zip(detail_urls[:5], listing):
+        assert budget.record_page(url, _page(name)) == 0
+
+    assert not budget.should_stop()
+    assert budget.is_branch_exhausted("https://shop.com/products/tee-9")
+    assert not budget.is_branch_exhausted("https://shop.com/shirts?page=2")
+
+    next_page = [f"Tee {i}" for i in range(10, 20)]
+    new_items, _ = _crawl_listing(
+        budget,
+        "https://shop.com/shirts?page=2",
+        next_page,
+        "https://shop.com/shirts?page=3",
+    )
+    assert new_items == 10
+    assert not budget.should_stop()
+
+    # Once the listing itself stops yielding, nothing productive is left.
+    for page in range(3, 6):
+        _crawl_listing(
+            budget,
+            f"https://shop.com/shirts?page={page}",
+            listing,
+            f"https://shop.com/shirts?page={page + 1}",
+        )
+    budget.record_page("https://shop.com/products/tee-10", _page("Tee 10"))
+    budget.record_page("https://shop.com/products/tee-11", _page("Tee 11"))
+    assert budget.should_stop()
+
+
+def test_budget_stops_on_detail_pages_after_listing_without_pagination():
+    budget = CrawlBudget()
+    listing = [f"Tee {i}" for i in range(14)]
+
+    _, detail_urls = _crawl_listing(
+        budget, "https://shop.com/collections/shirts", listing
+    )
+    stopped_after = None
+    for crawled, (url, name) in enumerate(zip(detail_urls, listing), start=1):
+        budget.record_page(url, _page(name))
+        if budget.should_stop():
+            stopped_after = crawled
+            break
+
+    assert stopped_after == budget.window
+
+
+def test_branch_productivity_expires_after_horizon():
+    budget = CrawlBudget(window=5, horizon=10)
+    # The next page is queued but never crawled, e.g. because the crawler reports it
+    # under a redirected url, so the listing branch keeps a pending link forever.
+    _crawl_listing(
+        budget, "https://shop.com/shirts", ["Tee"], "https://shop.com/shirts?page=2"
+    )
+
+    stopped_after = None
+    for page in range(1, 20):
+        budget.record_page(f"https://shop.com/products/p{page}", None)
+        if budget.should_stop():
+            stopped_after = page
+            break
+
+    assert stopped_after == budget.horizon
+
+
+def test_budget_without_min_yield_never_stops():
+    budget = CrawlBudget(min_yield=0, window=2, patience=2)
+    for page in range(4):
+        budget.record_page(f"https://shop.com/shirts/{page}", None)
+    assert not budget.should_stop()
+    assert not budget.is_branch_exhausted("https://shop.com/shirts/9")
@@ -0,0 +1,152 @@
+import sqlite3
+from decimal import Decimal
+
+import pytest
+
+from src.catalog import index_extracted_data, parse_price, query_catalog
+
+
+@pytest.mark.parametrize(
+    "price, expected",
+    [
+        ("$1,299.99", (Decimal("1299.99"), "USD")),
+        ("1.299,99 €", (Decimal("1299.99"), "EUR")),
+        ("12,50 €", (Decimal("12.50"), "EUR")),
+        ("1 299,00 €", (Decimal("1299.00"), "EUR")),
+        ("¥1,200", (Decimal("1200"), "JPY")),
+        ("1.299", (Decimal("1299"), None)),
+        ("1,5", (Decimal("1.5"), None)),
+    ],
+)
+def test_parse_price_separators(price, expected):
+    assert parse_price(price) == expected
+
+
+@pytest.mark.parametrize(
+    "price, expected",
+    [
+        ("£5", (Decimal("5"), "GBP")),
+        ("US$ 15.5", (Decimal("15.5"), "USD")),
+        ("USD 20", (Decimal("20"), "USD")),
+        ("Price: 49.99 EUR", (Decimal("49.99"), "EUR")),
+        ("2 for $10", (Decimal("10"), "USD")),
+        ("Was $20 now $15", (Decimal("15"), "USD")),
+        ("From $10 - $20", (Decimal("10"), "USD")),
+        ("$10 / €9", (Decimal("10"), "USD")),
+        ("€12 (US$ 14, now €9)", (Decimal("9"), "EUR")),
+        ("NEW arrivals 10", (Decimal("10"), None)),
+        ("QTY 2 $10", (Decimal("10"), "USD")),
+        ("20 PCS for $100", (Decimal("100"), "USD")),
+        ("Was $1,200 NOW 999", (Decimal("1200"), "USD")),
+        ("ABC 5", (Decimal("5"), None)),
+        ("Free", (None, None)),
+        ("", (None, None)),
+    ],
+)
+def test_parse_price_currency(price, expected):
+    assert parse_price(price) == expected
+
+
+def _page(page_url, category, items):
+    return {"page_url": page_url, "products": [{"category": category, "items": items}]}
+
+
+@pytest.fixture
+def catalog_db(tmp_path):
+    db_path = str(tmp_path / "catalog.db")
+    extracted_data = [
+        [
+            _page(
+                "https://www.shop-a.com/shirts",
+                "Shirts",
+                [
+                    {
+                        "name": "Blue Tee",
+                        "price": "$8",
+                        "url": "https://shop-a.com/blue",
+                    },
+                    {"name": "Red Tee", "price": "$12.50"},
+                ],
+            )
+        ],
+        _page(
+            "https://shop-a.com/shirts?page=2",
+            "shirts",
+            [{"name": "blue  tee", "price": "$7", "url": "https://shop-a.com/blue/"}],
+        ),
+        _page(
+            "https://shop-b.com/tees",
+            "Shirts",
+            [
+                {"name": "Green Tee", "price": "¥1000"},
+                {"name": "Yellow Tee", "price": "€5"},
+                {"name": "Red Tee", "price": "$3"},
+            ],
+        ),
+    ]
+    index_extracted_data(extracted_data, db_path=db_path)
+    return db_path
+
+
+def test_index_deduplicates_by_site_name_and_url(catalog_db):
+    items = query_catalog(db_path=catalog_db)
+    assert len(items) == 5
+    assert [item["name"] for item in items if item["site"] == "shop-a.com"] == [
+        "blue  tee",
+        "Red Tee",
+    ]
+
+
+def test_query_filters_by_site(catalog_db):
+    results = query_catalog(query="red", site="www.shop-a.com", db_path=catalog_db)
+    assert [(item["site"], item["amount"]) for item in results] == [
+        ("shop-a.com", "12.50")
+    ]
+
+
+def test_price_order_groups_currencies(catalog_db):
+    results = query_catalog(category="SHIRTS", db_path=catalog_db)
+    assert [(item["currency"], item["amount"]) for item in results] == [
+        ("EUR", "5.00"),
+        ("JPY", "1000.00"),
+        ("USD", "3.00"),
+        ("USD", "7.00"),
+        ("USD", "12.50"),
+    ]
+
+
+def test_query_filters_by_currency_and_price(catalog_db):
+    results = query_catalog(
+        query="te", currency="usd", min_price=5, max_price=10, db_path=catalog_db
+    )
+    assert [item["amount"] for item in results] == ["7.00"]
+
+
+def test_outdated_catalog_is_rebuilt(tmp_path):
+    db_path = str(tmp_path / "catalog.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name_key TEXT)")
+    conn.commit()
+    conn.close()
+
+    index_extracted_data(
+        [_page("https://shop-a.com", "Shirts", [{"name": "Tee", "price": "$1"}])],
+        db_path=db_path,
+    )
+    assert [item["site"] for item in query_catalog(db_path=db_path)] == ["shop-a.com"]
+
+
+def test_unrelated_database_is_not_dropped(tmp_path):
+    db_path = str(tmp_path / "other.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, sku TEXT)")
+    conn.execute("INSERT INTO items (sku) VALUES ('A-1')")
+    conn.commit()
+    conn.close()
+
+    with pytest.raises(sqlite3.DatabaseError):
+        query_catalog(db_path=db_path)
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT sku FROM items").fetchall() == [("A-1",)]
+    conn.close()
@@ -0,0 +1,105 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("crawl4ai")
+pytest.importorskip("google.genai")
+
+from src.tools import crawling
+from src.tools.distributed import ClaimedURLFilter, _plan_shards
+
+
+@pytest.fixture
+def formatted_urls(monkeypatch):
+    """Replaces the LLM formatting step and records the markdown of every formatted page."""
+    calls = []
+
+    async def fake_format_data_md(extracted_content, formatting_prompt):
+        calls.append(extracted_content)
+        items = [{"name": extracted_content, "price": "$1"}]
+        return [{"page_url": "", "products": [{"category": "Shirts", "items": items}]}]
+
+    monkeypatch.setattr(crawling, "_format_data_md", fake_format_data_md)
+    return calls
+
+
+async def _scraped(*urls):
+    for url in urls:
+        yield SimpleNamespace(url=url, markdown=url)
+
+
+def _extract(seen_urls, shard_id, *urls):
+    return asyncio.run(
+        crawling._extract_structured_data(
+            _scraped(*urls), seen_urls=seen_urls, shard_id=shard_id
+        )
+    )
+
+
+def test_page_claimed_by_another_shard_is_skipped(formatted_urls):
+    seen_urls = {}
+    _extract(seen_urls, "shard-a", "https://shop.com/shirts")
+
+    data = _extract(
+        seen_urls, "shard-b", "https://shop.com/shirts/", "https://shop.com/pants"
+    )
+
+    assert formatted_urls == ["https://shop.com/shirts", "https://shop.com/pants"]
+    assert [page[0]["page_url"] for page in data] == ["https://shop.com/pants"]
+    assert seen_urls == {
+        "https://shop.com/shirts": "shard-a",
+        "https://shop.com/pants": "shard-b",
+    }
+
+
+def test_shard_reprocessing_its_own_page_is_not_skipped(formatted_urls):
+    seen_urls = {"https://shop.com/shirts": "shard-a"}
+
+    data = _extract(seen_urls, "shard-a", "https://shop.com/shirts#top")
+
+    assert formatted_urls == ["https://shop.com/shirts#top"]
+    assert data[0][0]["page_url"] == "https://shop.com/shirts#top"
+
+
+def test_claimed_url_filter_rejects_links_of_other_shards():
+    seen_urls = {}
+    shard_a = ClaimedURLFilter(seen_urls, "shard-a")
+    shard_b = ClaimedURLFilter(seen_urls, "shard-b")
+
+    assert shard_a.apply("https://shop.com/shirts")
+    assert not shard_b.apply("https://shop.com/shirts/#reviews")
+    assert shard_a.apply("https://shop.com/shirts/")
+    assert shard_b.apply("https://shop.com/pants")
+    assert seen_urls == {
+        "https://shop.com/shirts": "shard-a",
+        "https://shop.com/pants": "shard-b",
+    }
+
+
+@pytest.mark.parametrize(
+    "num_roots, num_workers, max_pages, expected_shards",
+    [
+        (10, 4, 15, 4),
+        (2, 4, 15, 2),
+        (10, 4, 3, 3),
+        (1, 1, 15, 1),
+    ],
+)
+def test_plan_shards_splits_roots_and_page_budget(
+    num_roots, num_workers, max_pages, expected_shards
+):
+    roots = [f"https://shop.com/c/{i}" for i in range(num_roots)]
+
+    shards = _plan_shards(roots, num_workers, max_pages)
+
+    assert len(shards) == expected_shards
+    assert sorted(root for shard_roots, _ in shards for root in shard_roots) == sorted(
+        roots
+    )
+    assert sum(shard_max_pages for _, shard_max_pages in shards) == max_pages
+    assert all(shard_max_pages > 0 for _, shard_max_pages in shards)
+
+
+def test_plan_shards_without_pages_left():
+    assert _plan_shards(["https://shop.com/c/1"], 4, 0) == []